@@ -1,41 +1,225 @@
 from flask import Flask, render_template, jsonify, request, send_file
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import numpy as np
 import pandas as pd
+import orjson
+import functools
+import hashlib
 import os
 import json
-from datetime import datetime
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
 
-from data_loader import load_all_years, get_available_data
+from caching import LRUCache
+from data_loader import load_all_years, get_available_data, get_data_files, load_cached_features, save_cached_features
 from data_processor import resample, filter_by_date, get_data_summary
-from feature_engineering import add_cols
-from time_series_models import ARIMA_model, compare_models, fit_best_model
+from feature_engineering import add_cols_cached
+from time_series_models import ARIMA_model, compare_models, fit_best_model, fit_one_order, get_comparison_tasks, RESULT_COLUMNS
 from forecasting import predictions, predict_next_days, calculate_prediction_metrics, get_trading_signals
 from visualization import create_all_visualizations, plot_historical_prices, plot_predictions
-from config import FLASK_CONFIG
+from config import FLASK_CONFIG, AVAILABLE_COINS, CACHE_VERSION, DATA_CACHE_MAXSIZE, CHART_CACHE_MAX_AGE, API_CACHE_MAX_AGE, JOBS_DIR, JOB_MAX_AGE, MODEL_WORKERS
+
+
+def _orjson_default(obj):
+    if isinstance(obj, pd.Timestamp):
+        # Handed back as a datetime so OPT_NAIVE_UTC formats it like datetime64 arrays
+        return obj.to_pydatetime()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.dtype):
+        return str(obj)
+    if isinstance(obj, np.ndarray):
+        # orjson only encodes C-contiguous arrays of native dtypes itself
+        return obj.tolist() if obj.flags['C_CONTIGUOUS'] else np.ascontiguousarray(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
-data_cache = {}
+# In-memory tier; the Feather files under data/.cache are the shared on-disk tier
+data_cache = LRUCache(maxsize=DATA_CACHE_MAXSIZE)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    # Created lazily so each (possibly forked) worker process owns its own pool
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=MODEL_WORKERS)
+    return _executor
+
+
+def _reset_executor(broken):
+    # A pool that lost a worker (e.g. to the OOM killer) rejects every later submit,
+    # so drop it and let the next get_executor() start a fresh one
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _job_path(job_id):
+    return os.path.join(JOBS_DIR, f'{job_id}.json')
+
+
+def _write_job(job_id, job):
+    # Job state lives on disk so any Gunicorn worker can answer the poll
+    path = _job_path(job_id)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(job, default=_orjson_default, option=ORJSONProvider.option))
+    os.replace(tmp_path, path)
+
+
+def _expire_jobs():
+    # A job file is rewritten on every finished fit, so one left untouched for
+    # JOB_MAX_AGE belongs to a job that ended (or died) long ago
+    cutoff = time.time() - JOB_MAX_AGE
+    for entry in os.scandir(JOBS_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass  # Already removed by another worker
+
+
+def submit_model_job(train_data):
+    tasks = get_comparison_tasks(train_data)
+    job_id = uuid.uuid4().hex
+    job = {'status': 'running', 'completed': 0, 'failed': 0, 'total': len(tasks), 'models': []}
+    lock = threading.Lock()
+    
+    os.makedirs(JOBS_DIR, exist_ok=True)
+    _expire_jobs()
+    _write_job(job_id, job)
+    
+    attempt = 0
+    first_error = []
+    
+    def on_done(submitted_in, future):
+        error = future.exception()
+        row = None if error else future.result()
+        with lock:
+            if submitted_in != attempt or job['status'] != 'running':
+                return  # Left over from a broken pool, or the job already failed to submit
+            job['completed'] += 1
+            if row is not None:
+                job['models'].append(dict(zip(RESULT_COLUMNS, row)))
+            else:
+                # fit_one_order returns None for a fit that raised; an exception here
+                # means the task itself was lost, e.g. with its worker process
+                job['failed'] += 1
+                if error is not None and not first_error:
+                    first_error.append(error)
+            if job['completed'] == job['total']:
+                job['status'] = 'done'
+                if job['failed']:
+                    detail = f" (first lost task: {first_error[0]!r})" if first_error else ""
+                    print(f"Model job {job_id}: {job['failed']} of {job['total']} fits failed{detail}")
+            _write_job(job_id, job)
+    
+    def submit_all(executor):
+        callback = functools.partial(on_done, attempt)
+        for task in tasks:
+            executor.submit(fit_one_order, *task).add_done_callback(callback)
+    
+    try:
+        executor = get_executor()
+        try:
+            submit_all(executor)
+        except BrokenProcessPool:
+            print("Model worker pool is broken, starting a new one")
+            _reset_executor(executor)
+            with lock:
+                attempt += 1
+                job.update(completed=0, failed=0, models=[])
+            submit_all(get_executor())
+    except Exception as e:
+        # Otherwise the job file written above would report 'running' forever
+        with lock:
+            job.update(status='error', error=str(e))
+            _write_job(job_id, job)
+        raise
+    
+    return job_id, len(tasks)
 
 
 def load_data(coin='bitcoin', force_reload=False):
     cache_key = f"{coin}_data"
     
-    if cache_key not in data_cache or force_reload:
+    cached = None if force_reload else data_cache.get(cache_key)
+    if cached is None:
         print(f"Loading {coin} data...")
-        raw_data = load_all_years(coin)
-        daily_data = resample(raw_data, '1d')
-        featured_data = add_cols(daily_data)
+        featured_data = None if force_reload else load_cached_features(coin)
+        
+        if featured_data is None:
+            raw_data = load_all_years(coin)
+            daily_data = resample(raw_data, '1d')
+            featured_data = add_cols_cached(daily_data)
+            save_cached_features(featured_data, coin)
         
-        data_cache[cache_key] = {
-            'raw': raw_data,
-            'daily': daily_data,
+        cached = {
             'featured': featured_data
         }
+        data_cache[cache_key] = cached
         print(f"{coin} data loaded and cached!")
     
-    return data_cache[cache_key]
+    return cached
+
+
+def _data_validators(coin=None):
+    # Responses derived from the CSVs only change when the files (or the feature pipeline) do
+    state = [(os.path.basename(p), os.path.getmtime(p)) for p in get_data_files(coin)]
+    if not state:
+        # Nothing backs the response (e.g. an unknown coin), so it must not be cacheable;
+        # otherwise every such request would share the ETag of an empty file list
+        return None
+    etag = hashlib.md5(str((CACHE_VERSION, state)).encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(max(m for _, m in state), tz=timezone.utc)
+    return etag, last_modified
+
+
+def _apply_validators(response, validators):
+    if validators is None:
+        return response
+    etag, last_modified = validators
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = API_CACHE_MAX_AGE
+    return response
+
+
+def _not_modified(validators):
+    # Answer conditional GETs before any data is loaded or JSON is built
+    if validators is None:
+        return None
+    response = _apply_validators(app.response_class(), validators)
+    response.make_conditional(request)
+    return response if response.status_code == 304 else None
 
 
 @app.route('/')
@@ -46,11 +230,16 @@ def index():
 @app.route('/api/available-data')
 def available_data():
     try:
+        validators = _data_validators()
+        not_modified = _not_modified(validators)
+        if not_modified is not None:
+            return not_modified
+        
         available = get_available_data()
-        return jsonify({
+        return _apply_validators(jsonify({
             'success': True,
             'data': available
-        })
+        }), validators)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -61,35 +250,31 @@ def available_data():
 @app.route('/api/data/<coin>')
 def get_data(coin='bitcoin'):
     try:
+        validators = _data_validators(coin)
+        not_modified = _not_modified(validators)
+        if not_modified is not None:
+            return not_modified
+        
         data = load_data(coin)
         summary = get_data_summary(data['featured'])
         
+        # Per-row timestamps are serialized by the orjson provider; only the summary range is pre-formatted
         if 'date_range' in summary:
             summary['date_range']['start'] = summary['date_range']['start'].strftime('%Y-%m-%d')
             summary['date_range']['end'] = summary['date_range']['end'].strftime('%Y-%m-%d')
         
-        if 'price_stats' in summary:
-            summary['price_stats'] = {
-                'min': float(summary['price_stats']['min']),
-                'max': float(summary['price_stats']['max']),
-                'mean': float(summary['price_stats']['mean']),
-                'std': float(summary['price_stats']['std'])
-            }
-        
-        if 'missing_values' in summary:
-            summary['missing_values'] = {k: int(v) for k, v in summary['missing_values'].items()}
-        
-        if 'data_types' in summary:
-            summary['data_types'] = {k: str(v) for k, v in summary['data_types'].items()}
+        recent_data = data['featured'].tail(30)
         
-        recent_data = data['featured'].tail(30).reset_index()
-        recent_data['timestamp'] = recent_data['timestamp'].astype(str)
-        
-        return jsonify({
+        return _apply_validators(jsonify({
             'success': True,
             'summary': summary,
-            'recent_data': recent_data.to_dict(orient='records')
-        })
+            # Columnar layout: orjson writes the ndarrays directly, with no per-cell Python objects
+            'recent_data': {
+                'columns': list(recent_data.columns),
+                'index': recent_data.index.to_numpy(),
+                'data': recent_data.to_numpy()
+            }
+        }), validators)
     except Exception as e:
         print(f"Error in get_data: {e}")
         import traceback
@@ -104,13 +289,24 @@ def get_data(coin='bitcoin'):
 def historical_chart(coin='bitcoin'):
     try:
         data = load_data(coin)
-        chart_path = plot_historical_prices(data['featured'], 
-                                            save_path=f'static/charts/historical_{coin}.png')
+        featured = data['featured']
         
-        return jsonify({
+        # Without a save_path the chart is named after a digest of everything it draws
+        # (and the render version), and is only drawn when that file doesn't exist yet
+        chart_path = plot_historical_prices(featured, name=f'historical_{coin}', directory='static/charts')
+        chart_name = os.path.basename(chart_path)
+        
+        response = jsonify({
             'success': True,
-            'chart_url': f'/static/charts/historical_{coin}.png'
+            'chart_url': f'/static/charts/{chart_name}'
         })
+        # Validated by the chart itself rather than the CSVs: the name changes with the
+        # render version too, and the file exists by now, so a 304 never leaves the
+        # client holding a chart_url that has been replaced or pruned
+        response.set_etag(chart_name)
+        response.cache_control.public = True
+        response.cache_control.max_age = API_CACHE_MAX_AGE
+        return response.make_conditional(request)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -125,24 +321,14 @@ def run_models(coin='bitcoin'):
         train_end = request.json.get('train_end', '2021-10-01')
         train_data = filter_by_date(data['featured'], end_date=train_end)
         
-        print(f"Running model comparison on {len(train_data)} days of data...")
-        models_results = compare_models(train_data)
-        
-        models_json = models_results.head(20).copy()
-        models_json['RMSE'] = models_json['RMSE'].astype(float)
-        models_json['AIC'] = models_json['AIC'].astype(float)
-        models_json['order'] = models_json['order'].astype(str)
+        print(f"Submitting model comparison on {len(train_data)} days of data...")
+        job_id, total = submit_model_job(train_data)
         
         return jsonify({
             'success': True,
-            'models': models_json.to_dict(orient='records'),
-            'best_model': {
-                'type': models_json.iloc[0]['model type'],
-                'order': str(models_json.iloc[0]['order']),
-                'rmse': float(models_json.iloc[0]['RMSE']),
-                'aic': float(models_json.iloc[0]['AIC'])
-            }
-        })
+            'job_id': job_id,
+            'total': total
+        }), 202
     except Exception as e:
         print(f"Error running models: {e}")
         return jsonify({
@@ -151,6 +337,65 @@ def run_models(coin='bitcoin'):
         }), 500
 
 
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    try:
+        path = _job_path(uuid.UUID(job_id).hex)
+        if not os.path.exists(path):
+            raise FileNotFoundError
+        with open(path, 'rb') as f:
+            job = orjson.loads(f.read())
+    except (ValueError, FileNotFoundError):
+        return jsonify({
+            'success': False,
+            'error': f'Unknown job: {job_id}'
+        }), 404
+    
+    if job['status'] == 'error':
+        return jsonify({
+            'success': False,
+            'status': 'error',
+            'error': job['error']
+        }), 500
+    
+    if job['status'] != 'done':
+        return jsonify({
+            'success': True,
+            'status': job['status'],
+            'completed': job['completed'],
+            'failed': job['failed'],
+            'total': job['total']
+        })
+    
+    if not job['models']:
+        return jsonify({
+            'success': False,
+            'status': 'done',
+            'error': 'All model fits failed'
+        }), 500
+    
+    models_results = pd.DataFrame(job['models'], columns=RESULT_COLUMNS)
+    models_results = models_results.sort_values(['train_size', 'RMSE'], ascending=[False, True])
+    
+    models_json = models_results.head(20).copy()
+    models_json['order'] = models_json['order'].map(lambda order: str(tuple(order)))
+    
+    return jsonify({
+        'success': True,
+        'status': 'done',
+        'completed': job['completed'],
+        'failed': job['failed'],
+        'total': job['total'],
+        'models': models_json.to_dict(orient='records'),
+        'best_model': {
+            'type': models_json.iloc[0]['model type'],
+            'order': models_json.iloc[0]['order'],
+            'rmse': float(models_json.iloc[0]['RMSE']),
+            'aic': float(models_json.iloc[0]['AIC'])
+        }
+    })
+
+
 @app.route('/api/predict/<coin>', methods=['POST'])
 def predict(coin='bitcoin'):
     try:
@@ -168,23 +413,12 @@ def predict(coin='bitcoin'):
         
         pred_data = preds[['Close', 'pred_today', 'pred_tomorrow', 'pred_2_days']].tail(days + 5)
         pred_data = pred_data.reset_index()
-        pred_data['timestamp'] = pred_data['timestamp'].astype(str)
         pred_dict = pred_data.to_dict(orient='records')
-        import math
-        for record in pred_dict:
-            for key, value in record.items():
-                if isinstance(value, float) and math.isnan(value):
-                    record[key] = None
         
         signals_df = get_trading_signals(preds, 'pred_tomorrow')
         recent_signals = signals_df[['Close', 'pred_tomorrow', 'expected_change_pct', 'signal']].tail(10)
         recent_signals = recent_signals.reset_index()
-        recent_signals['timestamp'] = recent_signals['timestamp'].astype(str)
         signals_dict = recent_signals.to_dict(orient='records')
-        for record in signals_dict:
-            for key, value in record.items():
-                if isinstance(value, float) and math.isnan(value):
-                    record[key] = None
         
         return jsonify({
             'success': True,
@@ -212,7 +446,6 @@ def future_predict(coin='bitcoin'):
         future_preds = predict_next_days(data['featured'], days_ahead=days_ahead, order=order)
         
         future_preds_json = future_preds.reset_index()
-        future_preds_json['date'] = future_preds_json['date'].astype(str)
         
         return jsonify({
             'success': True,
@@ -228,20 +461,32 @@ def future_predict(coin='bitcoin'):
 
 @app.route('/static/charts/<filename>')
 def serve_chart(filename):
-    return send_file(f'static/charts/{filename}', mimetype='image/png')
+    max_age = CHART_CACHE_MAX_AGE if filename.startswith('historical_') else None
+    return send_file(f'static/charts/{filename}', mimetype='image/png', max_age=max_age)
 
 
-if __name__ == '__main__':
+def _preload_coin(coin):
+    try:
+        load_data(coin)
+        print(f"{coin} data preloaded successfully!")
+    except Exception as e:
+        print(f"Warning: Could not preload {coin} data: {e}")
+
+
+def preload_data():
     os.makedirs('static/charts', exist_ok=True)
     
-    print("Starting Flask application...")
     print("Loading initial data...")
     
-    try:
-        load_data('bitcoin')
-        print("Bitcoin data preloaded successfully!")
-    except Exception as e:
-        print(f"Warning: Could not preload Bitcoin data: {e}")
+    # Coins load independently; each hits its Feather cache first when one exists
+    with ThreadPoolExecutor(max_workers=len(AVAILABLE_COINS)) as executor:
+        list(executor.map(_preload_coin, AVAILABLE_COINS))
+
+
+if __name__ == '__main__':
+    # Development server only; in production run `gunicorn -c gunicorn.conf.py app:app`
+    print("Starting Flask application...")
+    preload_data()
     
     print(f"\nServer starting on http://{FLASK_CONFIG['HOST']}:{FLASK_CONFIG['PORT']}")
     print("Open your browser and navigate to the URL above")
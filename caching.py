@@ -0,0 +1,55 @@
+"""
+In-memory caching helpers shared by the data, feature and model-fit caches.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class LRUCache(OrderedDict):
+    """Thread-safe mapping that drops its least recently used entry past maxsize."""
+
+    def __init__(self, maxsize=8):
+        super().__init__()
+        self.maxsize = maxsize
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                del self[next(iter(self))]
+
+    def get(self, key, default=None):
+        # A check-then-index from the caller could race with an eviction
+        with self._lock:
+            return self[key] if key in self else default
+
+
+def frame_digest(data, *extra, digest_size=16):
+    """
+    Hex digest of a DataFrame or Series (values and index) or of an array's raw values.
+    
+    Column names and any extra arguments are folded in, so equal content gives the
+    same digest whatever object holds it.
+    """
+    if isinstance(data, np.ndarray):
+        payload = np.ascontiguousarray(data)
+        labels = (payload.dtype.str, payload.shape)
+    else:
+        payload = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        labels = list(data.columns) if isinstance(data, pd.DataFrame) else data.name
+    digest = hashlib.blake2b(payload.tobytes(), digest_size=digest_size)
+    digest.update(repr((labels, extra)).encode())
+    return digest.hexdigest()
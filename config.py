@@ -3,6 +3,12 @@ import os
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(PROJECT_ROOT, 'data')
 IMAGES_DIR = os.path.join(PROJECT_ROOT, 'images')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+CACHE_VERSION = 2  # bump when the feature pipeline output changes
+NUMBA_CACHE_DIR = os.path.join(CACHE_DIR, 'numba')
+DATA_CACHE_MAXSIZE = 8
+JOBS_DIR = os.path.join(CACHE_DIR, 'jobs')
+JOB_MAX_AGE = 6 * 3600  # seconds a model job file is kept after its last update
 
 AVAILABLE_COINS = ['bitcoin', 'ether']
 AVAILABLE_YEARS = [2017, 2018, 2019, 2020, 2021]
@@ -12,11 +18,22 @@ DEFAULT_RESAMPLE_PERIOD = '1d'
 MODEL_PARAMS = {
     'white_noise': {'order': (0, 0, 0)},
     'random_walk': {'order': (0, 1, 0)},
-    'random_walk_drift': {'order': (0, 1, 0), 'trend': 'c'},
+    'random_walk_drift': {'order': (0, 1, 0), 'trend': 't'},
     'best_arima': {'order': (2, 1, 2)},
 }
 
+# Passed to every ARIMA model: skip the stationarity/invertibility parameter transforms
+# and concentrate sigma2 out of the likelihood, so each fit optimises fewer, unconstrained parameters
+ARIMA_MODEL_KWARGS = {
+    'enforce_stationarity': False,
+    'enforce_invertibility': False,
+    'concentrate_scale': True,
+}
+
 TRAIN_TEST_SPLIT_DATE = '2021-10-01'
+# Processes used for model fits in each server process; gunicorn.conf.py sets
+# MODEL_WORKERS to split the CPUs between its workers
+MODEL_WORKERS = int(os.environ.get('MODEL_WORKERS', 0)) or os.cpu_count() or 1
 
 FLASK_CONFIG = {
     'DEBUG': True,
@@ -24,6 +41,9 @@ FLASK_CONFIG = {
     'PORT': 5000,
 }
 
+CHART_CACHE_MAX_AGE = 86400  # seconds; content-addressed charts never change in place
+API_CACHE_MAX_AGE = 60  # seconds; lets browsers and shared caches absorb bursts on data endpoints
+
 CHART_CONFIG = {
     'figsize': (20, 10),
     'colors': {
@@ -1,46 +1,144 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import glob
+import hashlib
 import os
-from config import DATA_DIR, DATA_COLUMNS
+from concurrent.futures import ThreadPoolExecutor
+from config import DATA_DIR, DATA_COLUMNS, CACHE_DIR, CACHE_VERSION
 
 
-def get_data(coin='bitcoin', year=2017):
+CSV_COLUMN_TYPES = {
+    'timestamp': pa.int64(),
+    'Count': pa.float64(),
+    'Open': pa.float32(),
+    'High': pa.float32(),
+    'Low': pa.float32(),
+    'Close': pa.float32(),
+    'Volume': pa.float32(),
+    'VWAP': pa.float32(),
+    'Target': pa.float32(),
+}
+
+
+def _read_table(coin, year):
     filepath = os.path.join(DATA_DIR, f'{coin}_{year}.csv')
     
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Data file not found: {filepath}")
     
-    df = pd.read_csv(filepath)
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-    df.set_index('timestamp', inplace=True)
-    df.sort_index(inplace=True)
-    df = df[DATA_COLUMNS]
+    convert_options = pacsv.ConvertOptions(
+        column_types=CSV_COLUMN_TYPES,
+        include_columns=['timestamp'] + DATA_COLUMNS,
+    )
+    table = pacsv.read_csv(filepath, convert_options=convert_options)
+    # Timestamps are stored as epoch seconds; cast in Arrow rather than via pd.to_datetime
+    timestamps = table.column('timestamp').cast(pa.timestamp('s'))
+    table = table.set_column(0, 'timestamp', timestamps)
     
-    return df
+    return table.sort_by('timestamp')
+
+
+def _table_to_frame(table):
+    df = table.to_pandas(self_destruct=True)
+    df.set_index('timestamp', inplace=True)
+    return df[DATA_COLUMNS]
+
+
+def get_data(coin='bitcoin', year=2017):
+    return _table_to_frame(_read_table(coin, year))
+
+
+def _load_year(coin, year):
+    try:
+        table = _read_table(coin, year)
+        print(f"Loaded {coin} data for {year}: {table.num_rows} records")
+        return table
+    except FileNotFoundError as e:
+        print(f"Warning: {e}")
+        return None
 
 
 def load_all_years(coin='bitcoin', years=None):
     if years is None:
         years = [2017, 2018, 2019, 2020, 2021]
     
-    dataframes = []
-    for year in years:
-        try:
-            df = get_data(coin, year)
-            dataframes.append(df)
-            print(f"Loaded {coin} data for {year}: {len(df)} records")
-        except FileNotFoundError as e:
-            print(f"Warning: {e}")
-            continue
-    
-    if not dataframes:
+    # Each year is an independent file and the pyarrow reader releases the GIL
+    max_workers = max(1, min(len(years), os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda year: _load_year(coin, year), years)
+        tables = [table for table in results if table is not None]
+    
+    if not tables:
         raise ValueError(f"No data files found for {coin}")
     
-    combined_df = pd.concat(dataframes, axis=0)
+    # Arrow concatenation only chains the per-year chunks; the single copy happens in to_pandas
+    combined_df = _table_to_frame(pa.concat_tables(tables))
     print(f"\nTotal records loaded: {len(combined_df)}")
     
     return combined_df
 
 
+def get_cache_path(coin='bitcoin', years=None):
+    if years is None:
+        years = [2017, 2018, 2019, 2020, 2021]
+    
+    csv_paths = [os.path.join(DATA_DIR, f'{coin}_{year}.csv') for year in years]
+    csv_paths = [p for p in csv_paths if os.path.exists(p)]
+    
+    if not csv_paths:
+        return None
+    
+    fingerprint = (CACHE_VERSION, sorted((p, os.path.getmtime(p)) for p in csv_paths))
+    cache_key = hashlib.md5(str(fingerprint).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f'{coin}_{cache_key}.feather')
+
+
+def load_cached_features(coin='bitcoin', years=None):
+    cache_path = get_cache_path(coin, years)
+    
+    if cache_path is None or not os.path.exists(cache_path):
+        return None
+    
+    try:
+        df = pd.read_feather(cache_path)
+    except (OSError, pa.ArrowInvalid) as e:
+        # A truncated or corrupt file would otherwise fail every load, since its
+        # mtime-based key never changes; drop it so the caller rebuilds the cache
+        print(f"Warning: discarding unreadable cache {cache_path}: {e}")
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+    
+    df.set_index('timestamp', inplace=True)
+    print(f"Loaded cached {coin} features from {cache_path}")
+    
+    return df
+
+
+def save_cached_features(df, coin='bitcoin', years=None):
+    cache_path = get_cache_path(coin, years)
+    
+    if cache_path is None:
+        return None
+    
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Written beside the final path and renamed into place, so an interrupted
+    # write never leaves a partial file under the cache key
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    df.reset_index().to_feather(tmp_path, compression='zstd')
+    os.replace(tmp_path, cache_path)
+    
+    return cache_path
+
+
+def get_data_files(coin=None):
+    pattern = f'{coin}_*.csv' if coin else '*.csv'
+    return sorted(glob.glob(os.path.join(DATA_DIR, pattern)))
+
+
 def get_available_data():
     available_data = {}
     
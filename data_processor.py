@@ -1,12 +1,12 @@
+import numpy as np
 import pandas as pd
 from config import DEFAULT_RESAMPLE_PERIOD
 
 
 def resample(df, time_period=DEFAULT_RESAMPLE_PERIOD):
-    df1 = df[['Open']].resample(time_period).first()
-    df2 = df[['Close']].resample(time_period).last()
-    df3 = df[['Volume']].resample(time_period).sum()
-    resampled_df = pd.concat([df1, df2, df3], axis=1)
+    resampled_df = df[['Open', 'Close', 'Volume']].resample(time_period).agg(
+        {'Open': 'first', 'Close': 'last', 'Volume': 'sum'}
+    )
     return resampled_df
 
 
@@ -23,6 +23,12 @@ def clean_data(df, drop_na=True):
 
 
 def filter_by_date(df, start_date=None, end_date=None):
+    if df.index.is_monotonic_increasing:
+        # Sorted index: locate the bounds by binary search and take one positional slice
+        lo = 0 if start_date is None else df.index.searchsorted(pd.Timestamp(start_date), side='left')
+        hi = len(df) if end_date is None else df.index.searchsorted(pd.Timestamp(end_date), side='right')
+        return df.iloc[lo:hi]
+    
     if start_date is not None:
         df = df[df.index >= start_date]
     
@@ -32,6 +38,22 @@ def filter_by_date(df, start_date=None, end_date=None):
     return df
 
 
+def _count_missing(df):
+    float_cols = df.select_dtypes(include='floating').columns
+    missing = dict.fromkeys(df.columns, 0)
+    
+    if len(float_cols) > 0:
+        # One isnan pass over the float block instead of a reduction per column
+        counts = np.isnan(df[float_cols].to_numpy()).sum(axis=0)
+        missing.update(zip(float_cols, counts.tolist()))
+    
+    other_cols = df.columns.difference(float_cols, sort=False)
+    if len(other_cols) > 0:
+        missing.update(df[other_cols].isnull().sum().to_dict())
+    
+    return missing
+
+
 def get_data_summary(df):
     summary = {
         'total_records': len(df),
@@ -40,17 +62,23 @@ def get_data_summary(df):
             'end': df.index.max(),
         },
         'columns': list(df.columns),
-        'missing_values': df.isnull().sum().to_dict(),
+        'missing_values': _count_missing(df),
         'data_types': df.dtypes.to_dict(),
     }
     
     if 'Close' in df.columns:
-        summary['price_stats'] = {
-            'min': float(df['Close'].min()),
-            'max': float(df['Close'].max()),
-            'mean': float(df['Close'].mean()),
-            'std': float(df['Close'].std()),
-        }
+        close = df['Close'].to_numpy(dtype=np.float64)
+        close = close[~np.isnan(close)]
+        
+        if close.size > 0:
+            summary['price_stats'] = {
+                'min': float(close.min()),
+                'max': float(close.max()),
+                'mean': float(close.mean()),
+                'std': float(close.std(ddof=1)) if close.size > 1 else float('nan'),
+            }
+        else:
+            summary['price_stats'] = dict.fromkeys(['min', 'max', 'mean', 'std'], float('nan'))
     
     return summary
 
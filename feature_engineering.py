@@ -1,48 +1,71 @@
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from caching import LRUCache, frame_digest
+from features_numba import compute_features, FEATURE_NAMES
+
+
+N_PRIOR_CLOSES = 7
+# Indicators are stored as float32; log_close stays float64 as the ARIMA target
+FEATURE_DTYPE = np.float32
+
+FEATURES_CACHE_MAXSIZE = 4
+_FEATURES_CACHE = LRUCache(maxsize=FEATURES_CACHE_MAXSIZE)
+
+
+def _shift(values, periods=1):
+    shifted = np.empty(len(values), dtype=np.result_type(values.dtype, FEATURE_DTYPE))
+    shifted[:periods] = np.nan
+    shifted[periods:] = values[:len(values) - periods]
+    return shifted
 
 
 def add_cols(df):
-    df = df.copy()
-    
-    df['log_open'] = np.log(df['Open'])
-    df['log_close'] = np.log(df['Close'])
-    df['return'] = np.log(df['Close'] / df['Close'].shift(1)).shift(1)
-    
-    for i in range(7):
-        days_ago = f'close_{i+1}_prior'
-        df[days_ago] = df['log_close'].shift(i + 1)
-    
-    df['sma_7'] = df['Close'].rolling(7).mean().shift(1)
-    df['sma_30'] = df['Close'].rolling(30).mean().shift(1)
-    df['sma_50'] = df['Close'].rolling(50).mean().shift(1)
-    df['sma_200'] = df['Close'].rolling(200).mean().shift(1)
-    
-    df['dist_sma_7'] = (df['Close'] - df['sma_7']).shift(1)
-    df['dist_sma_30'] = (df['Close'] - df['sma_30']).shift(1)
-    df['dist_sma_50'] = (df['Close'] - df['sma_50']).shift(1)
-    df['dist_sma_200'] = (df['Close'] - df['sma_200']).shift(1)
-    
-    df['momentum_7'] = df['return'].rolling(7).mean().shift(1)
-    df['momentum_30'] = df['return'].rolling(30).mean().shift(1)
-    df['momentum_50'] = df['return'].rolling(50).mean().shift(1)
-    df['momentum_200'] = df['return'].rolling(200).mean().shift(1)
-    
-    df['volatility_7'] = df['return'].rolling(7).std().shift(1)
-    df['volatility_30'] = df['return'].rolling(30).std().shift(1)
-    df['volatility_50'] = df['return'].rolling(50).std().shift(1)
-    df['volatility_200'] = df['return'].rolling(200).std().shift(1)
-    
-    df['volume_7'] = df['Volume'].rolling(7).mean().shift(1)
-    df['volume_14'] = df['Volume'].rolling(14).mean().shift(1)
-    df['volume_30'] = df['Volume'].rolling(30).mean().shift(1)
-    df['volume_50'] = df['Volume'].rolling(50).mean().shift(1)
-    
-    df['Volume'] = df['Volume'].shift(1)
-    
-    df.dropna(inplace=True)
-    
-    return df
+    close = df['Close'].to_numpy(dtype=FEATURE_DTYPE)
+    volume = df['Volume'].to_numpy(dtype=FEATURE_DTYPE)
+    log_close = np.log(close, dtype=np.float64)
+    
+    new_cols = {
+        'log_open': np.log(df['Open'].to_numpy(dtype=FEATURE_DTYPE)),
+        'log_close': log_close,
+    }
+    
+    # log(C_t / C_t-1) is just the first difference of log_close
+    ret = _shift(np.diff(log_close, prepend=np.nan))
+    new_cols['return'] = ret.astype(FEATURE_DTYPE)
+    
+    # Row i of the window view holds log_close[i-7..i-1]; reversed, column k is the (k+1)-day lag
+    padded = np.concatenate([np.full(N_PRIOR_CLOSES, np.nan, dtype=FEATURE_DTYPE), log_close.astype(FEATURE_DTYPE)])
+    priors = sliding_window_view(padded, N_PRIOR_CLOSES)[:-1, ::-1]
+    for i in range(N_PRIOR_CLOSES):
+        new_cols[f'close_{i+1}_prior'] = priors[:, i]
+    
+    rolling = np.empty((len(df), len(FEATURE_NAMES)), dtype=FEATURE_DTYPE)
+    compute_features(close, ret, volume, rolling)
+    new_cols.update(zip(FEATURE_NAMES, rolling.T))
+    
+    new_cols['Volume'] = _shift(volume)
+    
+    # The input is never written to, so build the result in one construction instead of
+    # copying it and inserting columns; updating the dict keeps Volume in its original slot
+    columns = {name: df[name].to_numpy() for name in df.columns}
+    columns.update(new_cols)
+    result = pd.DataFrame(columns, index=df.index)
+    result.dropna(inplace=True)
+    
+    return result
+
+
+def add_cols_cached(df):
+    # Keyed on content rather than identity, so a reloaded but unchanged frame is a hit.
+    # The cached frame is shared between callers and must not be modified in place.
+    key = frame_digest(df)
+    featured = _FEATURES_CACHE.get(key)
+    if featured is None:
+        featured = add_cols(df)
+        _FEATURES_CACHE[key] = featured
+    
+    return featured
 
 
 def get_feature_columns(include_target=False):
@@ -65,7 +88,18 @@ def get_feature_columns(include_target=False):
 
 
 def calculate_feature_importance(df, target='log_close'):
-    correlations = df.corr()[target].drop(target)
+    features = df.drop(columns=target)
+    x = features.to_numpy(dtype=np.float64)
+    y = df[target].to_numpy(dtype=np.float64)
+    
+    # Only the target's row of the correlation matrix is needed, so take it from
+    # one matrix-vector product on centred data instead of df.corr()
+    x = x - x.mean(axis=0)
+    y = y - y.mean()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (x.T @ y) / np.sqrt(np.einsum('ij,ij->j', x, x) * (y @ y))
+    
+    correlations = pd.Series(corr, index=features.columns, name=target)
     return correlations.abs().sort_values(ascending=False)
 
 
@@ -0,0 +1,113 @@
+"""
+Numba kernels for single-pass feature engineering.
+"""
+
+import os
+from config import NUMBA_CACHE_DIR
+os.environ.setdefault('NUMBA_CACHE_DIR', NUMBA_CACHE_DIR)
+
+import numpy as np
+from numba import njit
+
+
+PRICE_WINDOWS = (7, 30, 50, 200)
+VOLUME_WINDOWS = (7, 14, 30, 50)
+
+FEATURE_NAMES = (
+    [f'sma_{w}' for w in PRICE_WINDOWS]
+    + [f'dist_sma_{w}' for w in PRICE_WINDOWS]
+    + [f'momentum_{w}' for w in PRICE_WINDOWS]
+    + [f'volatility_{w}' for w in PRICE_WINDOWS]
+    + [f'volume_{w}' for w in VOLUME_WINDOWS]
+)
+
+_N_PRICE = len(PRICE_WINDOWS)
+SMA_COL = 0
+DIST_COL = _N_PRICE
+MOMENTUM_COL = 2 * _N_PRICE
+VOLATILITY_COL = 3 * _N_PRICE
+VOLUME_COL = 4 * _N_PRICE
+
+
+@njit(cache=True)
+def _rolling_moments(x, window, out, mean_col, std_col):
+    """
+    Write the lagged rolling mean (and optionally std) of x into out.
+    
+    Row i receives the statistics of x[i-window..i-1], matching
+    ``x.rolling(window).mean().shift(1)``; any NaN inside the window
+    yields NaN, as in pandas. Moments are maintained with Welford's
+    add/remove updates so each window costs O(1) per row.
+    """
+    n = x.shape[0]
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    
+    if n > 0:
+        out[0, mean_col] = np.nan
+        if std_col >= 0:
+            out[0, std_col] = np.nan
+    
+    for i in range(n - 1):
+        val = x[i]
+        if not np.isnan(val):
+            nobs += 1
+            delta = val - mean
+            mean += delta / nobs
+            ssqdm += delta * (val - mean)
+        
+        if i >= window:
+            old = x[i - window]
+            if not np.isnan(old):
+                nobs -= 1
+                if nobs > 0:
+                    delta = old - mean
+                    mean -= delta / nobs
+                    ssqdm -= delta * (old - mean)
+                else:
+                    mean = 0.0
+                    ssqdm = 0.0
+        
+        if nobs == window:
+            out[i + 1, mean_col] = mean
+            if std_col >= 0:
+                out[i + 1, std_col] = np.sqrt(max(ssqdm, 0.0) / (window - 1))
+        else:
+            out[i + 1, mean_col] = np.nan
+            if std_col >= 0:
+                out[i + 1, std_col] = np.nan
+
+
+@njit(cache=True)
+def compute_features(close, ret, vol, out):
+    """
+    Compute every rolling feature used by add_cols in one call.
+    
+    Parameters:
+    -----------
+    close : np.ndarray
+        Daily close prices (float32 or float64)
+    ret : np.ndarray
+        Lagged log returns
+    vol : np.ndarray
+        Daily volume
+    out : np.ndarray
+        Preallocated (len(close), len(FEATURE_NAMES)) float matrix,
+        filled in FEATURE_NAMES column order. Moments are accumulated
+        in float64 regardless of the output dtype.
+    """
+    n = close.shape[0]
+    
+    for k in range(_N_PRICE):
+        w = PRICE_WINDOWS[k]
+        _rolling_moments(close, w, out, SMA_COL + k, -1)
+        _rolling_moments(ret, w, out, MOMENTUM_COL + k, VOLATILITY_COL + k)
+        
+        if n > 0:
+            out[0, DIST_COL + k] = np.nan
+        for i in range(1, n):
+            out[i, DIST_COL + k] = close[i - 1] - out[i - 1, SMA_COL + k]
+    
+    for k in range(len(VOLUME_WINDOWS)):
+        _rolling_moments(vol, VOLUME_WINDOWS[k], out, VOLUME_COL + k, -1)
@@ -5,12 +5,63 @@ Forecasting module for cryptocurrency price prediction.
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from statsmodels.tsa.arima.model import ARIMA
+from joblib import Parallel, delayed
+from config import MODEL_WORKERS
+from time_series_models import build_arima
+from caching import LRUCache, frame_digest
 import warnings
 warnings.filterwarnings('ignore')
 
 
-def predictions(df, start_date='2021-10-01', days_to_predict=30, order=(2, 1, 2)):
+SIGNAL_CATEGORIES = ['BUY', 'SELL', 'HOLD']
+
+FIT_CACHE_MAXSIZE = 32
+_FIT_CACHE = LRUCache(maxsize=FIT_CACHE_MAXSIZE)
+
+
+def _fit_arima(y, order):
+    """
+    Fit an ARIMA model, reusing an earlier fit on the same values and order.
+    
+    The cache is keyed on a digest of the data rather than its identity, so
+    a reloaded but unchanged series is still a hit. Cached results are shared
+    between callers; forecast() and append() do not modify them.
+    
+    Parameters:
+    -----------
+    y : array-like
+        Training values of log_close
+    order : tuple
+        ARIMA order (p, d, q)
+    
+    Returns:
+    --------
+    ARIMAResults
+        Fitted ARIMA model
+    """
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    key = frame_digest(y, tuple(order))
+    fitmodel = _FIT_CACHE.get(key)
+    if fitmodel is None:
+        model = build_arima(y, order)
+        fitmodel = model.fit()
+        _FIT_CACHE[key] = fitmodel
+    
+    return fitmodel
+
+
+def _refit_forecast(pred_date, y, order):
+    # Module-level so joblib can run it in a worker process
+    try:
+        model = build_arima(y, order)
+        fitmodel = model.fit()
+        return fitmodel.forecast(3)
+    except Exception as e:
+        print(f"  Warning: Could not generate prediction for {pred_date}: {e}")
+        return np.nan
+
+
+def predictions(df, start_date='2021-10-01', days_to_predict=30, order=(2, 1, 2), refit=False):
     """
     Generate price predictions for multiple days ahead.
     
@@ -24,6 +75,10 @@ def predictions(df, start_date='2021-10-01', days_to_predict=30, order=(2, 1, 2)
         Number of days to generate predictions for
     order : tuple
         ARIMA order (p, d, q)
+    refit : bool
+        If True, re-estimate the model parameters for every prediction date.
+        If False, fit once and extend the state filter with each day's new
+        observations, keeping the first fit's parameters
     
     Returns:
     --------
@@ -34,41 +89,60 @@ def predictions(df, start_date='2021-10-01', days_to_predict=30, order=(2, 1, 2)
     d = pd.date_range(start=date, end=date + timedelta(days_to_predict))
     
     data = df['log_close']
-    predictions_list = []
+    if not data.index.is_monotonic_increasing:
+        data = data.sort_index()
+    
+    # Position of each prediction date in the index, so data before it is a plain slice
+    values = data.to_numpy()
+    cuts = data.index.searchsorted(d, side='left')
+    has_history = cuts >= 10  # Need minimum data points
+    
+    # 3-day forecasts stay in log space, one row per date, until the end
+    forecasts = np.full((len(d), 3), np.nan)
+    fitmodel = None
+    n_seen = 0
     
     print(f"Generating predictions for {len(d)} days...")
     
-    for idx, pred_date in enumerate(d):
-        # Use data up to the current date
-        y = data[data.index < pred_date]
-        
-        if len(y) < 10:  # Need minimum data points
-            continue
-        
-        try:
-            # Fit model and generate forecast
-            model = ARIMA(endog=y, order=order)
-            fitmodel = model.fit()
-            y_pred = fitmodel.forecast(3)  # Forecast 3 days ahead
-            
-            # Convert from log space back to price
-            pred_today = np.exp(y_pred.values[0]) if len(y_pred) > 0 else np.nan
-            pred_tomorrow = np.exp(y_pred.values[1]) if len(y_pred) > 1 else np.nan
-            pred_2_days = np.exp(y_pred.values[2]) if len(y_pred) > 2 else np.nan
+    if refit:
+        # Every date is an independent fit on its own history, so fan them out
+        tasks = [delayed(_refit_forecast)(pred_date, values[:cut], order)
+                 for pred_date, cut in zip(d[has_history], cuts[has_history])]
+        results = Parallel(n_jobs=min(MODEL_WORKERS, max(len(tasks), 1)))(tasks)
+        for idx, y_pred in zip(np.flatnonzero(has_history), results):
+            forecasts[idx] = y_pred
+    else:
+        # Fit once, then extend the state filter as each day's observations arrive
+        for idx, (pred_date, cut) in enumerate(zip(d, cuts)):
+            if not has_history[idx]:
+                continue
             
-            predictions_list.append([pred_date, pred_today, pred_tomorrow, pred_2_days])
+            # Use data up to the current date
+            y = values[:cut]
             
-            if (idx + 1) % 10 == 0:
-                print(f"  Processed {idx + 1}/{len(d)} days...")
-        except Exception as e:
-            print(f"  Warning: Could not generate prediction for {pred_date}: {e}")
-            predictions_list.append([pred_date, np.nan, np.nan, np.nan])
-    
-    # Create predictions dataframe
+            try:
+                if fitmodel is None:
+                    # Fit model and generate forecast
+                    fitmodel = _fit_arima(y, order)
+                elif len(y) > n_seen:
+                    # Run the Kalman filter over the new observations only
+                    fitmodel = fitmodel.append(y[n_seen:], refit=False)
+                n_seen = len(y)
+                
+                forecasts[idx] = fitmodel.forecast(3)  # Forecast 3 days ahead
+                
+                if (idx + 1) % 10 == 0:
+                    print(f"  Processed {idx + 1}/{len(d)} days...")
+            except Exception as e:
+                print(f"  Warning: Could not generate prediction for {pred_date}: {e}")
+                fitmodel = None
+    
+    # Create predictions dataframe, converting from log space back to price in one call
     preds = pd.DataFrame(
-        predictions_list,
-        columns=['timestamp', 'pred_today', 'pred_tomorrow', 'pred_2_days']
-    ).set_index('timestamp')
+        np.exp(forecasts[has_history]),
+        index=pd.Index(d[has_history], name='timestamp'),
+        columns=['pred_today', 'pred_tomorrow', 'pred_2_days']
+    )
     
     # Merge with original dataframe
     df2 = df.merge(preds, left_index=True, right_index=True, how='left')
@@ -96,27 +170,26 @@ def predict_next_days(df, days_ahead=7, order=(2, 1, 2)):
     pd.DataFrame
         DataFrame with predicted prices and dates
     """
-    y = df['log_close']
+    y = df['log_close'].to_numpy()
     
     # Fit model on all available data
-    model = ARIMA(endog=y, order=order)
-    fitted_model = model.fit()
+    fitted_model = _fit_arima(y, order)
     
     # Generate forecast
-    forecast = fitted_model.forecast(steps=days_ahead)
+    forecast = np.asarray(fitted_model.forecast(steps=days_ahead))
     
     # Create date range for predictions
     last_date = df.index[-1]
     future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=days_ahead)
     
     # Convert from log space to prices
-    predicted_prices = np.exp(forecast.values)
+    predicted_prices = np.exp(forecast)
     
     # Create results dataframe
     results = pd.DataFrame({
         'date': future_dates,
         'predicted_price': predicted_prices,
-        'log_predicted_price': forecast.values
+        'log_predicted_price': forecast
     })
     results.set_index('date', inplace=True)
     
@@ -141,25 +214,29 @@ def calculate_prediction_metrics(df, actual_col='Close', pred_col='pred_today'):
     dict
         Dictionary with RMSE, MAE, and MAPE metrics
     """
+    actual = df[actual_col].to_numpy(dtype=np.float64)
+    predicted = df[pred_col].to_numpy(dtype=np.float64)
+    
     # Filter out NaN values
-    valid_data = df[[actual_col, pred_col]].dropna()
+    valid = ~(np.isnan(actual) | np.isnan(predicted))
+    count = int(np.count_nonzero(valid))
     
-    if len(valid_data) == 0:
+    if count == 0:
         return {'rmse': np.nan, 'mae': np.nan, 'mape': np.nan, 'count': 0}
     
-    actual = valid_data[actual_col]
-    predicted = valid_data[pred_col]
+    actual = actual[valid]
+    abs_error = np.abs(actual - predicted[valid])
     
     # Calculate metrics
-    rmse = np.sqrt(np.mean((actual - predicted) ** 2))
-    mae = np.mean(np.abs(actual - predicted))
-    mape = np.mean(np.abs((actual - predicted) / actual)) * 100
+    rmse = np.sqrt(np.dot(abs_error, abs_error) / count)
+    mae = abs_error.mean()
+    mape = (abs_error / np.abs(actual)).mean() * 100
     
     return {
-        'rmse': rmse,
-        'mae': mae,
-        'mape': mape,
-        'count': len(valid_data)
+        'rmse': float(rmse),
+        'mae': float(mae),
+        'mape': float(mape),
+        'count': count
     }
 
 
@@ -187,9 +264,9 @@ def get_trading_signals(df, pred_col='pred_tomorrow'):
     
     # Generate signals
     # Buy if expected increase > 1%, Sell if expected decrease > 1%, otherwise Hold
-    df['signal'] = 'HOLD'
-    df.loc[df['expected_change_pct'] > 1, 'signal'] = 'BUY'
-    df.loc[df['expected_change_pct'] < -1, 'signal'] = 'SELL'
+    pct = df['expected_change_pct'].to_numpy()
+    codes = np.select([pct > 1, pct < -1], [0, 1], default=2).astype(np.int8)
+    df['signal'] = pd.Categorical.from_codes(codes, categories=SIGNAL_CATEGORIES)
     
     return df
 
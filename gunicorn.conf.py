@@ -0,0 +1,26 @@
+import multiprocessing
+import os
+
+workers = 2 * multiprocessing.cpu_count() + 1
+
+# Every worker owns its own model pool, so they share the CPUs between them rather
+# than each starting one process per CPU. Set before config is first imported.
+os.environ.setdefault('MODEL_WORKERS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+from config import FLASK_CONFIG
+
+bind = f"{FLASK_CONFIG['HOST']}:{FLASK_CONFIG['PORT']}"
+
+worker_class = 'gthread'
+threads = 4
+
+# Model fitting can hold a request for well over the 30s default
+timeout = 120
+
+# Load the app (and its data cache) in the master so workers share it copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    import app
+    app.preload_data()
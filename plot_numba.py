@@ -0,0 +1,64 @@
+"""
+Numba kernels for thinning long series before they are plotted.
+"""
+
+import os
+from config import NUMBA_CACHE_DIR
+os.environ.setdefault('NUMBA_CACHE_DIR', NUMBA_CACHE_DIR)
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def lttb_indices(x, y, n_out):
+    """
+    Return the indices of n_out points of (x, y) chosen by Largest-Triangle-Three-Buckets.
+    
+    The first and last points are always kept; each bucket in between keeps the
+    point forming the largest triangle with the previously kept point and the
+    mean of the next bucket, so peaks and troughs survive. NaN values only win a
+    bucket that is entirely NaN, which keeps gaps in partial series.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        
+        avg_x = 0.0
+        avg_y = 0.0
+        count = 0
+        for j in range(end, next_end):
+            if not np.isnan(y[j]):
+                avg_x += x[j]
+                avg_y += y[j]
+                count += 1
+        if count > 0:
+            avg_x /= count
+            avg_y /= count
+        else:
+            avg_x = x[next_end - 1]
+            avg_y = y[a]
+        
+        chosen = start
+        max_area = -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > max_area:
+                max_area = area
+                chosen = j
+        
+        idx[i + 1] = chosen
+        a = chosen
+    
+    return idx
@@ -17,6 +17,11 @@ function hideLoading() {
     document.getElementById('loading-overlay').style.display = 'none';
 }
 
+// Trim ISO timestamps from the API (e.g. 2021-10-01T00:00:00+00:00) to the date
+function formatDate(value) {
+    return value ? value.slice(0, 10) : 'N/A';
+}
+
 // Load data summary
 async function loadDataSummary() {
     try {
@@ -31,11 +36,14 @@ async function loadDataSummary() {
 
             if (summary.price_stats) {
                 // Get the last data point for current price
-                if (data.recent_data && data.recent_data.length > 0) {
-                    const lastData = data.recent_data[data.recent_data.length - 1];
-                    if (lastData.Close) {
+                // recent_data is columnar: {columns, index, data} with one row array per date
+                const recent = data.recent_data;
+                if (recent && recent.data.length > 0) {
+                    const lastRow = recent.data[recent.data.length - 1];
+                    const lastClose = lastRow[recent.columns.indexOf('Close')];
+                    if (lastClose) {
                         document.getElementById('current-price').textContent =
-                            '$' + parseFloat(lastData.Close).toLocaleString(undefined, { maximumFractionDigits: 0 });
+                            '$' + parseFloat(lastClose).toLocaleString(undefined, { maximumFractionDigits: 0 });
                     }
                 }
 
@@ -62,7 +70,8 @@ async function loadHistoricalChart() {
         const data = await response.json();
 
         if (data.success) {
-            container.innerHTML = `<img src="${data.chart_url}?t=${Date.now()}" alt="Historical Price Chart">`;
+            // chart_url is content-addressed, so the browser cache can be used as-is
+            container.innerHTML = `<img src="${data.chart_url}" alt="Historical Price Chart">`;
         } else {
             container.innerHTML = `<div class="loading-state"><p style="color: #f5576c;">Error: ${data.error}</p></div>`;
         }
@@ -72,6 +81,26 @@ async function loadHistoricalChart() {
     }
 }
 
+// Poll a background job until it finishes or the deadline passes
+async function waitForJob(jobId, interval = 2000, timeout = 10 * 60 * 1000) {
+    const deadline = Date.now() + timeout;
+
+    while (Date.now() < deadline) {
+        const response = await fetch(`${API_BASE}/api/jobs/${jobId}`);
+        const data = await response.json();
+
+        if (!data.success || data.status === 'done') {
+            return data;
+        }
+
+        document.getElementById('loading-text').textContent =
+            `Running time series models... ${data.completed}/${data.total} fits complete`;
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+
+    return { success: false, error: 'Timed out waiting for the model run to finish' };
+}
+
 // Run models comparison
 async function runModels() {
     showLoading('Running time series models... This may take 1-2 minutes');
@@ -89,7 +118,8 @@ async function runModels() {
             })
         });
 
-        const data = await response.json();
+        const job = await response.json();
+        const data = job.success ? await waitForJob(job.job_id) : job;
 
         if (data.success) {
             // Display best model
@@ -210,7 +240,7 @@ async function generatePredictions() {
                 data.predictions.slice(-10).forEach(pred => {
                     html += `
                         <tr>
-                            <td>${pred.timestamp}</td>
+                            <td>${formatDate(pred.timestamp)}</td>
                             <td>${pred.Close ? '$' + pred.Close.toLocaleString(undefined, { maximumFractionDigits: 2 }) : 'N/A'}</td>
                             <td>${pred.pred_today ? '$' + pred.pred_today.toLocaleString(undefined, { maximumFractionDigits: 2 }) : 'N/A'}</td>
                             <td>${pred.pred_tomorrow ? '$' + pred.pred_tomorrow.toLocaleString(undefined, { maximumFractionDigits: 2 }) : 'N/A'}</td>
@@ -245,7 +275,7 @@ async function generatePredictions() {
                         signal.signal === 'SELL' ? 'style="color: #f5576c;"' : '';
                     html += `
                         <tr>
-                            <td>${signal.timestamp}</td>
+                            <td>${formatDate(signal.timestamp)}</td>
                             <td>$${signal.Close ? signal.Close.toLocaleString(undefined, { maximumFractionDigits: 2 }) : 'N/A'}</td>
                             <td>$${signal.pred_tomorrow ? signal.pred_tomorrow.toLocaleString(undefined, { maximumFractionDigits: 2 }) : 'N/A'}</td>
                             <td>${signal.expected_change_pct ? signal.expected_change_pct.toFixed(2) + '%' : 'N/A'}</td>
@@ -313,7 +343,7 @@ async function predictFuture() {
             data.predictions.forEach(pred => {
                 html += `
                     <tr>
-                        <td>${pred.date}</td>
+                        <td>${formatDate(pred.date)}</td>
                         <td>$${pred.predicted_price.toLocaleString(undefined, { maximumFractionDigits: 2 })}</td>
                         <td>${pred.log_predicted_price.toFixed(4)}</td>
                     </tr>
@@ -5,10 +5,126 @@ Time series models module for cryptocurrency price prediction.
 import pandas as pd
 import numpy as np
 from statsmodels.tsa.arima.model import ARIMA
+from joblib import Parallel, delayed
+from config import MODEL_WORKERS, ARIMA_MODEL_KWARGS
 import warnings
 warnings.filterwarnings('ignore')
 
 
+RESULT_COLUMNS = ['model type', 'train_size', 'order', 'AIC', 'RMSE']
+BASELINE_TRAIN_SIZE = 500
+ARIMA_ORDERS = [(p, d, q) for p in range(3) for d in range(1, 4) for q in range(3)]
+
+
+def build_arima(endog, order, exog=None, trend=None):
+    """
+    Create an ARIMA model with the project-wide ARIMA_MODEL_KWARGS.
+    
+    Parameters:
+    -----------
+    endog : array-like
+        Training values of log_close
+    order : tuple
+        ARIMA order (p, d, q)
+    exog : array-like
+        Exogenous regressors aligned with endog (optional)
+    trend : str
+        ARIMA trend specification (optional)
+    
+    Returns:
+    --------
+    ARIMA
+        Unfitted ARIMA model
+    """
+    model = ARIMA(endog=endog, exog=exog, order=order, trend=trend, **ARIMA_MODEL_KWARGS)
+    if model.k_params == 0:
+        # Concentrating sigma2 out of e.g. a plain random walk leaves nothing to optimise
+        kwargs = dict(ARIMA_MODEL_KWARGS, concentrate_scale=False)
+        model = ARIMA(endog=endog, exog=exog, order=order, trend=trend, **kwargs)
+    return model
+
+
+def fit_one_order(y, order, model_type='ARIMA', exog=None, trend=None):
+    """
+    Fit a single ARIMA order and score it.
+    
+    Module-level so it can be pickled and run in a worker process.
+    
+    Parameters:
+    -----------
+    y : np.ndarray
+        Training values of log_close
+    order : tuple
+        ARIMA order (p, d, q)
+    model_type : str
+        Label stored in the 'model type' column
+    exog : np.ndarray
+        Exogenous regressors aligned with y (optional)
+    trend : str
+        ARIMA trend specification (optional)
+    
+    Returns:
+    --------
+    list or None
+        Row matching RESULT_COLUMNS, or None if the fit failed
+    """
+    try:
+        model = build_arima(y, order, exog=exog, trend=trend)
+        fitmodel = model.fit()
+    except Exception:
+        return None
+    
+    return [model_type, len(y), tuple(order), fitmodel.aic, np.sqrt(fitmodel.mse)]
+
+
+def _results_frame(rows):
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    return results.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+
+
+def _fit_orders(tasks):
+    # The fits are independent, so spread the grid across worker processes
+    n_jobs = max(min(MODEL_WORKERS, len(tasks)), 1)
+    results = Parallel(n_jobs=n_jobs)(delayed(fit_one_order)(*task) for task in tasks)
+    return [row for row in results if row is not None]
+
+
+def _arimax_exog(df):
+    df_copy = df.drop(['Close', 'log_close_diff'], axis=1, errors='ignore')
+    return df_copy.drop('log_close', axis=1)
+
+
+def get_comparison_tasks(df):
+    """
+    List the individual fits that compare_models performs.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        DataFrame with features and log_close column
+    
+    Returns:
+    --------
+    list
+        Argument tuples for fit_one_order, using plain NumPy arrays so
+        they are cheap to send to worker processes
+    """
+    y = df['log_close'].to_numpy()
+    x = _arimax_exog(df).to_numpy()
+    
+    tasks = []
+    for size in [len(y), BASELINE_TRAIN_SIZE]:
+        tasks.append((y[-size:], (0, 1, 0), 'random walk'))
+    for size in [len(y), BASELINE_TRAIN_SIZE]:
+        tasks.append((y[-size:], (0, 1, 0), 'random walk drift', None, 't'))
+    for order in ARIMA_ORDERS:
+        tasks.append((y, order, 'ARIMA'))
+    for order in ARIMA_ORDERS:
+        tasks.append((y, order, 'ARIMAX', x))
+    
+    return tasks
+
+
 def white_noise_model(df):
     """
     Fit a white noise model (ARIMA with all parameters = 0).
@@ -25,19 +141,17 @@ def white_noise_model(df):
         DataFrame with model results and RMSE scores
     """
     y = df['log_close']
-    train_size = [len(y), 500]  # Reduced from [len(y), 500, 250, 100, 50] for faster execution
+    train_size = [len(y), BASELINE_TRAIN_SIZE]  # Reduced from [len(y), 500, 250, 100, 50] for faster execution
     
-    aic_scores = []
+    rows = []
     
     for size in train_size:
-        model = ARIMA(endog=y.tail(size), order=(0, 0, 0))
+        model = build_arima(y.tail(size), (0, 0, 0))
         fitmodel = model.fit()
         rmse = np.sqrt(fitmodel.mse)
-        aic_scores.append(pd.DataFrame(['white noise', size, (0, 0, 0), fitmodel.aic, rmse]).T)
+        rows.append(('white noise', size, (0, 0, 0), fitmodel.aic, rmse))
     
-    wn_df = pd.concat(aic_scores, axis=0)
-    wn_df = wn_df.set_axis(['model type', 'train_size', 'order', 'AIC', 'RMSE'], axis=1)
-    return_df = wn_df.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+    return_df = _results_frame(rows)
     
     return return_df
 
@@ -60,22 +174,20 @@ def random_walk_model(df, for_backtest=False):
         Results DataFrame or fitted model
     """
     y = df['log_close']
-    train_size = [len(y), 500]  # Reduced for faster execution
+    train_size = [len(y), BASELINE_TRAIN_SIZE]  # Reduced for faster execution
     
-    aic_scores = []
+    rows = []
     
     for size in train_size:
-        model = ARIMA(endog=y.tail(size), order=(0, 1, 0))
+        model = build_arima(y.tail(size), (0, 1, 0))
         fitmodel = model.fit()
         rmse = np.sqrt(fitmodel.mse)
-        aic_scores.append(pd.DataFrame(['random walk', size, (0, 1, 0), fitmodel.aic, rmse]).T)
+        rows.append(('random walk', size, (0, 1, 0), fitmodel.aic, rmse))
     
-    rw_df = pd.concat(aic_scores, axis=0)
-    rw_df = rw_df.set_axis(['model type', 'train_size', 'order', 'AIC', 'RMSE'], axis=1)
-    return_df = rw_df.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+    return_df = _results_frame(rows)
     
     if for_backtest:
-        best_model = ARIMA(endog=y.tail(return_df['train_size'][0]), order=(0, 1, 0))
+        best_model = build_arima(y.tail(return_df['train_size'][0]), (0, 1, 0))
         best_fit_model = best_model.fit()
         return best_fit_model
     else:
@@ -84,7 +196,10 @@ def random_walk_model(df, for_backtest=False):
 
 def random_walk_drift_model(df):
     """
-    Fit a random walk with drift model (ARIMA with d=1, p=q=0, trend='c').
+    Fit a random walk with drift model (ARIMA with d=1, p=q=0, trend='t').
+    
+    With one difference, a linear time trend in the levels is the constant
+    drift of the differenced series; trend='c' is rejected when d > 0.
     
     Parameters:
     -----------
@@ -97,19 +212,17 @@ def random_walk_drift_model(df):
         DataFrame with model results and RMSE scores
     """
     y = df['log_close']
-    train_size = [len(y), 500]  # Reduced for faster execution
+    train_size = [len(y), BASELINE_TRAIN_SIZE]  # Reduced for faster execution
     
-    aic_scores = []
+    rows = []
     
     for size in train_size:
-        model = ARIMA(endog=y.tail(size), order=(0, 1, 0))
+        model = build_arima(y.tail(size), (0, 1, 0), trend='t')
         fitmodel = model.fit()
         rmse = np.sqrt(fitmodel.mse)
-        aic_scores.append(pd.DataFrame(['random walk drift', size, (0, 1, 0), fitmodel.aic, rmse]).T)
+        rows.append(('random walk drift', size, (0, 1, 0), fitmodel.aic, rmse))
     
-    rwd_df = pd.concat(aic_scores, axis=0)
-    rwd_df = rwd_df.set_axis(['model type', 'train_size', 'order', 'AIC', 'RMSE'], axis=1)
-    return_df = rwd_df.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+    return_df = _results_frame(rows)
     
     return return_df
 
@@ -129,24 +242,17 @@ def ARMA_model(df):
     pd.DataFrame
         DataFrame with model results and RMSE scores
     """
-    y = df['log_close']
-    aic_scores = []
+    y = df['log_close'].to_numpy()
+    tasks = []
     train_size = [len(y)]  # Only use full dataset for faster execution
     
-    for p in range(3):  # Reduced from 6 to 3
-        for q in range(3):  # Reduced from 6 to 3
-            for size in train_size:
-                try:
-                    model = ARIMA(endog=y.tail(size), order=(p, 0, q))
-                    fitmodel = model.fit()
-                    rmse = np.sqrt(fitmodel.mse)
-                    aic_scores.append(pd.DataFrame(['ARMA', size, (p, 0, q), fitmodel.aic, rmse]).T)
-                except:
-                    continue
-    
-    arma_df = pd.concat(aic_scores, axis=0)
-    arma_df = arma_df.set_axis(['model type', 'train_size', 'order', 'AIC', 'RMSE'], axis=1)
-    return_df = arma_df.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+    for size in train_size:
+        y_train = y[-size:]  # Sliced once per size, shared by every order
+        for p in range(3):  # Reduced from 6 to 3
+            for q in range(3):  # Reduced from 6 to 3
+                tasks.append((y_train, (p, 0, q), 'ARMA'))
+    
+    return_df = _results_frame(_fit_orders(tasks))
     
     return return_df
 
@@ -166,25 +272,16 @@ def ARIMA_model(df):
     pd.DataFrame
         DataFrame with model results and RMSE scores
     """
-    y = df['log_close']
-    aic_scores = []
+    y = df['log_close'].to_numpy()
+    tasks = []
     train_size = [len(y)]  # Only use full dataset for faster execution
     
-    for p in range(3):
-        for d in range(1, 4):
-            for q in range(3):
-                for size in train_size:
-                    try:
-                        model = ARIMA(endog=y.tail(size), order=(p, d, q))
-                        fitmodel = model.fit()
-                        rmse = np.sqrt(fitmodel.mse)
-                        aic_scores.append(pd.DataFrame(['ARIMA', size, (p, d, q), fitmodel.aic, rmse]).T)
-                    except:
-                        continue
-    
-    arima_df = pd.concat(aic_scores, axis=0)
-    arima_df = arima_df.set_axis(['model type', 'train_size', 'order', 'AIC', 'RMSE'], axis=1)
-    return_df = arima_df.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+    for size in train_size:
+        y_train = y[-size:]  # Sliced once per size, shared by every order
+        for order in ARIMA_ORDERS:
+            tasks.append((y_train, order, 'ARIMA'))
+    
+    return_df = _results_frame(_fit_orders(tasks))
     
     return return_df
 
@@ -206,29 +303,18 @@ def ARIMAX_model(df, test_size=3):
     pd.DataFrame
         DataFrame with model results and RMSE scores
     """
-    df_copy = df.drop(['Close', 'log_close_diff'], axis=1, errors='ignore')
-    
-    x = df_copy.drop('log_close', axis=1)
-    y = df_copy['log_close']
+    x = _arimax_exog(df).to_numpy()
+    y = df['log_close'].to_numpy()
     
-    aic_scores = []
+    tasks = []
     train_size = [len(y)]  # Only use full dataset for faster execution
     
-    for p in range(3):
-        for d in range(1, 4):
-            for q in range(3):
-                for size in train_size:
-                    try:
-                        model = ARIMA(endog=y.tail(size), exog=x.tail(size), order=(p, d, q))
-                        fitmodel = model.fit()
-                        rmse = np.sqrt(fitmodel.mse)
-                        aic_scores.append(pd.DataFrame(['ARIMAX', size, (p, d, q), fitmodel.aic, rmse]).T)
-                    except:
-                        continue
-    
-    arimax_df = pd.concat(aic_scores, axis=0)
-    arimax_df = arimax_df.set_axis(['model type', 'train_size', 'order', 'AIC', 'RMSE'], axis=1)
-    return_df = arimax_df.sort_values(['train_size', 'RMSE'], ascending=[False, True]).reset_index(drop=True)
+    for size in train_size:
+        y_train, x_train = y[-size:], x[-size:]  # Sliced once per size, shared by every order
+        for order in ARIMA_ORDERS:
+            tasks.append((y_train, order, 'ARIMAX', x_train))
+    
+    return_df = _results_frame(_fit_orders(tasks))
     
     return return_df
 
@@ -247,21 +333,12 @@ def compare_models(df):
     pd.DataFrame
         DataFrame with all model results sorted by RMSE
     """
-    print("Running Random Walk model...")
-    rw = random_walk_model(df)
-    
-    print("Running Random Walk with Drift model...")
-    rwd = random_walk_drift_model(df)
-    
-    print("Running ARIMA models...")
-    arima = ARIMA_model(df)
-    
-    print("Running ARIMAX models...")
-    arimax = ARIMAX_model(df)
+    tasks = get_comparison_tasks(df)
     
-    # Combine all models
-    all_models = pd.concat([rw, rwd, arima, arimax], axis=0)
-    all_models = all_models.sort_values(['train_size', 'RMSE'], ascending=[False, True])
+    # Submit the random walk, drift, ARIMA and ARIMAX fits as one batch so the
+    # workers stay busy across model families instead of draining per family
+    print(f"Running {len(tasks)} models...")
+    all_models = _results_frame(_fit_orders(tasks))
     
     return all_models
 
@@ -283,7 +360,7 @@ def fit_best_model(df, order=(2, 1, 2)):
         Fitted ARIMA model
     """
     y = df['log_close']
-    model = ARIMA(endog=y, order=order)
+    model = build_arima(y, order)
     fitted_model = model.fit()
     
     return fitted_model
@@ -2,62 +2,395 @@
 Visualization module for cryptocurrency data and predictions.
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for Flask
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from config import CHART_CONFIG, IMAGES_DIR
+from config import CHART_CONFIG, IMAGES_DIR, CHART_CACHE_MAX_AGE, API_CACHE_MAX_AGE
+import io
 import os
+import re
+import threading
+import time
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from plot_numba import lttb_indices
+from caching import frame_digest
 
 
-def plot_historical_prices(df, save_path=None, show_sma=True):
+# Roughly two points per pixel column of the widest chart at dpi=100; Agg's cost grows
+# with segment count, and extra points past this collapse onto the same pixels
+MAX_PLOT_POINTS = int(CHART_CONFIG['figsize'][0] * 100 * 2)
+
+# Plotted values only need pixel precision
+PLOT_DTYPE = np.float32
+
+# zlib level for chart PNGs; level 1 encodes noticeably faster than the default 6
+# at the cost of somewhat larger files
+PNG_COMPRESS_LEVEL = 1
+
+# Charts are written as 8-bit palette PNGs. They hold a few thousand colours at most,
+# nearly all antialiasing blends, so a full 256-entry palette keeps edges clean where
+# a 16-colour one visibly shifts line colours
+PNG_PALETTE_COLORS = 256
+
+# Part of every content-addressed chart name; bump it whenever the way charts are
+# drawn or encoded changes, so files rendered by older code are not served again
+CHART_VERSION = 1
+CHART_DIGEST_SIZE = 8
+
+# A superseded chart is only pruned once nobody can still hold its URL: not handed out
+# (see _reuse) for longer than its JSON and the image itself may be cached
+CHART_KEEP_SECONDS = CHART_CACHE_MAX_AGE + API_CACHE_MAX_AGE
+
+# While create_all_visualizations renders a batch, figures are reused between its
+# charts of the same size instead of being rebuilt. They are kept per thread since a
+# figure must not be drawn from two threads at once, and only for the batch, so that
+# request threads never hold on to full-size canvases
+_FIGURE_CACHE = threading.local()
+
+
+@lru_cache(maxsize=None)
+def _mpl():
     """
-    Plot historical Bitcoin prices with optional SMA overlays.
+    Import the matplotlib pieces used for drawing on first use.
+    
+    Importing matplotlib takes a large share of a cold start, so it is
+    deferred until a chart is actually drawn rather than paid whenever
+    this module is imported (e.g. by a Flask worker serving cached charts).
+    
+    Returns:
+    --------
+    module
+        matplotlib, with the submodules used here imported
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for Flask
+    import matplotlib.figure
+    import matplotlib.backends.backend_agg
+    import matplotlib.collections
+    import matplotlib.lines
+    import matplotlib.dates
+    return matplotlib
+
+
+def _new_axes(figsize):
+    mpl = _mpl()
+    # Constrained layout is solved inside the one draw that renders the PNG, where
+    # tight_layout() needed a separate measuring pass first
+    fig = mpl.figure.Figure(figsize=figsize, constrained_layout=True)
+    mpl.backends.backend_agg.FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def _get_axes(figsize):
+    """
+    Return a cleared (figure, axes) pair of the given size.
+    
+    Outside a create_all_visualizations batch a new figure is built each
+    time, and freed with its last reference once the chart is saved.
+    
+    Parameters:
+    -----------
+    figsize : tuple
+        Figure size in inches
+    
+    Returns:
+    --------
+    tuple
+        Figure and its single Axes, cleared for a new chart
+    """
+    key = tuple(figsize)
+    figures = getattr(_FIGURE_CACHE, 'figures', None)
+    if figures is None:
+        return _new_axes(key)
+    
+    if key not in figures:
+        figures[key] = _new_axes(key)
+    
+    fig, ax = figures[key]
+    ax.clear()
+    return fig, ax
+
+
+def _reuse(save_path):
+    # An existing content-addressed chart is served as is; touching it records that
+    # its URL was just handed out, which keeps _prune_older away from it
+    try:
+        os.utime(save_path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _prune_older(save_path):
+    # Content-addressed charts are only ever superseded, so once a new digest of a
+    # chart is written the older files of the same name can go when they are stale.
+    # Only exact <name>_<digest>.png names match, never e.g. the tracked presentation images.
+    directory, filename = os.path.split(save_path)
+    digest = rf'_[0-9a-f]{{{2 * CHART_DIGEST_SIZE}}}\.png'
+    stem = re.fullmatch(rf'(.+){digest}', filename)
+    if stem is None:
+        return
+    
+    older = re.compile(re.escape(stem.group(1)) + digest)
+    cutoff = time.time() - CHART_KEEP_SECONDS
+    for other in os.listdir(directory or '.'):
+        if other != filename and older.fullmatch(other):
+            path = os.path.join(directory, other)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass  # Already removed by another worker
+
+
+def _write_png(rgba, save_path, dpi, prune=False):
+    from PIL import Image
+    # The figures are opaque, so alpha is dropped before quantising
+    image = Image.fromarray(rgba[..., :3]).quantize(PNG_PALETTE_COLORS, method=Image.Quantize.FASTOCTREE)
+    
+    # The octree stores each bucket's mean, which turns the white background into
+    # (254, 254, 254); put the background's own entry back to its exact colour
+    palette = image.getpalette()
+    background = image.getpixel((0, 0))
+    palette[3 * background:3 * background + 3] = rgba[0, 0, :3].tolist()
+    image.putpalette(palette)
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', dpi=(dpi, dpi), compress_level=PNG_COMPRESS_LEVEL)
+    
+    # Written in one go and renamed into place, so a caller that finds the
+    # content-addressed path already there never reads a half-written chart
+    tmp_path = f'{save_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer.getbuffer())
+    os.replace(tmp_path, save_path)
+    
+    if prune:
+        _prune_older(save_path)
+    return save_path
+
+
+def _save_png(fig, save_path, dpi=100, prune=False):
+    """
+    Render a figure with its Agg canvas and write it as a PNG with Pillow.
+    
+    Parameters:
+    -----------
+    fig : Figure
+        Figure to save, attached to a FigureCanvasAgg
+    save_path : str
+        Path of the PNG file
+    dpi : int
+        Resolution to render at
+    prune : bool
+        Whether save_path is content-addressed, so that older digests of the same
+        chart are deleted once it is written
+    
+    Returns:
+    --------
+    str
+        Path where the figure was saved
+    """
+    # savefig() goes through print_figure's per-call setup (canvas switch, facecolor
+    # and dpi swaps) before reaching the same Agg draw and Pillow encode
+    fig.set_dpi(dpi)
+    fig.canvas.draw()
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    return _write_png(rgba, save_path, dpi, prune)
+
+
+def _select(df, columns):
+    return df[df.columns.intersection(columns, sort=False)]
+
+
+def _content_path(name, data, *options, directory=None):
+    """
+    Build a default chart path named after a digest of what the chart draws.
+    
+    Parameters:
+    -----------
+    name : str
+        File name stem, e.g. 'historical_prices'
+    data : pd.DataFrame
+        Only the columns the chart plots, with their index
+    *options
+        Any other arguments that change the rendered chart
+    directory : str
+        Directory of the chart file (default: IMAGES_DIR)
+    
+    Returns:
+    --------
+    str
+        Chart path; if it already exists it holds this exact chart
+    """
+    digest = frame_digest(data, CHART_VERSION, options, digest_size=CHART_DIGEST_SIZE)
+    return os.path.join(directory or IMAGES_DIR, f'{name}_{digest}.png')
+
+
+def _shifted(values, periods):
+    # Same values as Series.shift(periods), as a NaN-padded array rather than a new Series
+    if periods == 0:
+        return values
+    out = np.full(len(values), np.nan, dtype=values.dtype)
+    if periods > 0:
+        out[periods:] = values[:-periods]
+    else:
+        out[:periods] = values[-periods:]
+    return out
+
+
+def _downsample(index, values):
+    """
+    Thin a series to at most MAX_PLOT_POINTS points for plotting.
+    
+    Parameters:
+    -----------
+    index : pd.DatetimeIndex
+        x values of the series
+    values : array-like
+        y values aligned with index, may contain NaN
+    
+    Returns:
+    --------
+    tuple
+        (x, y) arrays to pass to ax.plot
+    """
+    y = np.asarray(values, dtype=PLOT_DTYPE)
+    if len(y) <= MAX_PLOT_POINTS:
+        return index, y
+    
+    # Only the valid points are thinned; on a mostly-NaN column (e.g. a short run of
+    # predictions on a long index) the buckets would otherwise fall in the NaN region
+    valid = np.flatnonzero(~np.isnan(y))
+    keep = valid
+    if len(valid) > MAX_PLOT_POINTS:
+        keep = valid[lttb_indices(index.asi8[valid].astype(np.float64), y[valid], MAX_PLOT_POINTS)]
+    
+    # One NaN per interior gap still breaks the line there, as in the unthinned series
+    gaps = valid[:-1][np.diff(valid) > 1] + 1
+    if len(gaps):
+        keep = np.union1d(keep, gaps)
+    return index[keep], y[keep]
+
+
+# (column, color key, linewidth, alpha, label, shift) for each line, drawn in order
+# when the column is present; a shift moves the series like Series.shift
+PRICE_SERIES = [
+    ('Close', 'primary', 2, 1.0, 'Close Price', 0),
+]
+
+SMA_SERIES = [
+    ('sma_30', 'secondary', 1.5, 0.8, '30 Day Moving Average', 0),
+    ('sma_200', 'tertiary', 1.5, 0.8, '200 Day Moving Average', 0),
+]
+
+# Predictions are shifted to align with the day they're predicting
+PREDICTION_SERIES = [
+    ('Close', 'primary', 2, 1.0, 'Actual Close Price', 0),
+    ('pred_today', 'accent', 1.5, 0.8, 'Predicted Today', 0),
+    ('pred_tomorrow', 'tertiary', 1.5, 0.8, 'Predicted Tomorrow', 1),
+    ('pred_2_days', 'quaternary', 1.5, 0.8, 'Predicted Two Days Out', 2),
+]
+
+# All predictions shifted back one day to overlap
+OVERLAP_SERIES = [
+    ('Close', 'primary', 2, 1.0, 'Actual Close Price', 0),
+    ('pred_today', 'accent', 1.5, 0.7, 'Predicted Today', -1),
+    ('pred_tomorrow', 'tertiary', 1.5, 0.7, 'Predicted Tomorrow', -1),
+    ('pred_2_days', 'quaternary', 1.5, 0.7, 'Predicted Two Days Out', -1),
+]
+
+
+def _plot_lines(df, series_specs, save_path, default_name, directory=None, ylabel='Price of Bitcoin'):
+    """
+    Draw a dollar-priced line chart of the given series and save it.
     
     Parameters:
     -----------
     df : pd.DataFrame
-        DataFrame with Close and SMA columns
+        DataFrame holding the columns named in series_specs
+    series_specs : list
+        (column, color key, linewidth, alpha, label, shift) tuples
     save_path : str
-        Path to save the figure (optional)
-    show_sma : bool
-        Whether to show SMA lines
+        Path to save the figure; if None, a content-addressed path is used
+    default_name : str
+        File name stem used when save_path is None
+    directory : str
+        Directory of the content-addressed file (default: IMAGES_DIR)
+    ylabel : str
+        Label of the price axis
     
     Returns:
     --------
     str
         Path where the figure was saved
     """
-    fig, ax = plt.subplots(figsize=CHART_CONFIG['figsize'])
-    
-    # Plot closing price
-    ax.plot(df.index, df['Close'], color=CHART_CONFIG['colors']['primary'], linewidth=2, label='Close Price')
-    
-    # Plot SMAs if requested and available
-    if show_sma:
-        if 'sma_30' in df.columns:
-            ax.plot(df.index, df['sma_30'], color=CHART_CONFIG['colors']['secondary'], 
-                   linewidth=1.5, alpha=0.8, label='30 Day Moving Average')
-        if 'sma_200' in df.columns:
-            ax.plot(df.index, df['sma_200'], color=CHART_CONFIG['colors']['tertiary'], 
-                   linewidth=1.5, alpha=0.8, label='200 Day Moving Average')
-    
-    ax.set_ylabel('Price of Bitcoin', size=CHART_CONFIG['fontsize']['title'])
-    ax.set_xlabel('Date', size=CHART_CONFIG['fontsize']['label'])
+    content_addressed = save_path is None
+    if content_addressed:
+        plotted = _select(df, [spec[0] for spec in series_specs])
+        save_path = _content_path(default_name, plotted, series_specs, directory=directory)
+        if _reuse(save_path):
+            return save_path
+    
+    colors = CHART_CONFIG['colors']
+    fontsize = CHART_CONFIG['fontsize']
+    fig, ax = _get_axes(CHART_CONFIG['figsize'])
+    
+    mpl = _mpl()
+    index = df.index
+    columns = df.columns
+    segments, line_colors, linewidths, handles = [], [], [], []
+    for column, color, linewidth, alpha, label, shift in series_specs:
+        if column in columns:
+            values = _shifted(df[column].to_numpy(dtype=PLOT_DTYPE), shift)
+            x, y = _downsample(index, values)
+            segments.append(np.column_stack([mpl.dates.date2num(x), y]))
+            line_colors.append(mpl.colors.to_rgba(colors[color], alpha))
+            linewidths.append(linewidth)
+            # The collection has no per-line labels, so the legend gets stand-in lines
+            handles.append(mpl.lines.Line2D([], [], color=colors[color], linewidth=linewidth, 
+                                            alpha=alpha, label=label))
+    
+    # One collection draws every series in a single call instead of one Line2D each;
+    # NaN gaps (e.g. from the shifts) break a line just as they do in ax.plot
+    lines = mpl.collections.LineCollection(segments, colors=line_colors, linewidths=linewidths, 
+                                           capstyle='projecting', joinstyle='round')
+    ax.add_collection(lines)
+    ax.xaxis_date()
+    ax.autoscale_view()
+    
+    ax.set_ylabel(ylabel, size=fontsize['title'])
+    ax.set_xlabel('Date', size=fontsize['label'])
     ax.yaxis.set_major_formatter('${x:1,.0f}')
-    ax.legend(loc=2, fontsize=CHART_CONFIG['fontsize']['legend'], edgecolor='1')
+    ax.legend(handles=handles, loc=2, fontsize=fontsize['legend'], edgecolor='1')
     ax.grid(True, alpha=0.3)
-    plt.tight_layout()
     
-    # Save figure
-    if save_path is None:
-        save_path = os.path.join(IMAGES_DIR, 'historical_prices.png')
+    return _save_png(fig, save_path, prune=content_addressed)
+
+
+def plot_historical_prices(df, save_path=None, show_sma=True, name='historical_prices', directory=None):
+    """
+    Plot historical Bitcoin prices with optional SMA overlays.
     
-    plt.savefig(save_path, dpi=100, bbox_inches='tight')
-    plt.close()
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        DataFrame with Close and SMA columns
+    save_path : str
+        Path to save the figure (optional)
+    show_sma : bool
+        Whether to show SMA lines
+    name : str
+        File name stem of the content-addressed path used without save_path
+    directory : str
+        Directory of that path (default: IMAGES_DIR)
     
-    return save_path
+    Returns:
+    --------
+    str
+        Path where the figure was saved
+    """
+    series_specs = PRICE_SERIES + SMA_SERIES if show_sma else PRICE_SERIES
+    return _plot_lines(df, series_specs, save_path, name, directory=directory)
 
 
 def plot_predictions(df, save_path=None):
@@ -76,41 +409,7 @@ def plot_predictions(df, save_path=None):
     str
         Path where the figure was saved
     """
-    fig, ax = plt.subplots(figsize=CHART_CONFIG['figsize'])
-    
-    # Plot actual close price
-    ax.plot(df.index, df['Close'], color=CHART_CONFIG['colors']['primary'], 
-           linewidth=2, label='Actual Close Price')
-    
-    # Plot predictions if available
-    if 'pred_today' in df.columns:
-        ax.plot(df.index, df['pred_today'], color=CHART_CONFIG['colors']['accent'], 
-               linewidth=1.5, alpha=0.8, label='Predicted Today')
-    
-    if 'pred_tomorrow' in df.columns:
-        # Shift predictions to align with the day they're predicting
-        ax.plot(df.index, df['pred_tomorrow'].shift(1), color=CHART_CONFIG['colors']['tertiary'], 
-               linewidth=1.5, alpha=0.8, label='Predicted Tomorrow')
-    
-    if 'pred_2_days' in df.columns:
-        ax.plot(df.index, df['pred_2_days'].shift(2), color=CHART_CONFIG['colors']['quaternary'], 
-               linewidth=1.5, alpha=0.8, label='Predicted Two Days Out')
-    
-    ax.set_ylabel('Price of Bitcoin', size=CHART_CONFIG['fontsize']['title'])
-    ax.set_xlabel('Date', size=CHART_CONFIG['fontsize']['label'])
-    ax.yaxis.set_major_formatter('${x:1,.0f}')
-    ax.legend(loc=2, fontsize=CHART_CONFIG['fontsize']['legend'], edgecolor='1')
-    ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    
-    # Save figure
-    if save_path is None:
-        save_path = os.path.join(IMAGES_DIR, 'predictions_chart.png')
-    
-    plt.savefig(save_path, dpi=100, bbox_inches='tight')
-    plt.close()
-    
-    return save_path
+    return _plot_lines(df, PREDICTION_SERIES, save_path, 'predictions_chart')
 
 
 def plot_predictions_overlap(df, save_path=None):
@@ -129,40 +428,7 @@ def plot_predictions_overlap(df, save_path=None):
     str
         Path where the figure was saved
     """
-    fig, ax = plt.subplots(figsize=CHART_CONFIG['figsize'])
-    
-    # Plot actual close price
-    ax.plot(df.index, df['Close'], color=CHART_CONFIG['colors']['primary'], 
-           linewidth=2, label='Actual Close Price')
-    
-    # Plot all predictions shifted back to overlap
-    if 'pred_today' in df.columns:
-        ax.plot(df.index, df['pred_today'].shift(-1), color=CHART_CONFIG['colors']['accent'], 
-               linewidth=1.5, alpha=0.7, label='Predicted Today')
-    
-    if 'pred_tomorrow' in df.columns:
-        ax.plot(df.index, df['pred_tomorrow'].shift(-1), color=CHART_CONFIG['colors']['tertiary'], 
-               linewidth=1.5, alpha=0.7, label='Predicted Tomorrow')
-    
-    if 'pred_2_days' in df.columns:
-        ax.plot(df.index, df['pred_2_days'].shift(-1), color=CHART_CONFIG['colors']['quaternary'], 
-               linewidth=1.5, alpha=0.7, label='Predicted Two Days Out')
-    
-    ax.set_ylabel('Price of Bitcoin', size=CHART_CONFIG['fontsize']['title'])
-    ax.set_xlabel('Date', size=CHART_CONFIG['fontsize']['label'])
-    ax.yaxis.set_major_formatter('${x:1,.0f}')
-    ax.legend(loc=2, fontsize=CHART_CONFIG['fontsize']['legend'], edgecolor='1')
-    ax.grid(True, alpha=0.3)
-    plt.tight_layout()
-    
-    # Save figure
-    if save_path is None:
-        save_path = os.path.join(IMAGES_DIR, 'overlap_chart.png')
-    
-    plt.savefig(save_path, dpi=100, bbox_inches='tight')
-    plt.close()
-    
-    return save_path
+    return _plot_lines(df, OVERLAP_SERIES, save_path, 'overlap_chart')
 
 
 def plot_returns_distribution(df, save_path=None):
@@ -181,24 +447,27 @@ def plot_returns_distribution(df, save_path=None):
     str
         Path where the figure was saved
     """
-    fig, ax = plt.subplots(figsize=(12, 6))
+    content_addressed = save_path is None
+    if content_addressed:
+        save_path = _content_path('returns_distribution', _select(df, ['return']))
+        if _reuse(save_path):
+            return save_path
+    
+    colors = CHART_CONFIG['colors']
+    fontsize = CHART_CONFIG['fontsize']
+    fig, ax = _get_axes((12, 6))
     
     if 'return' in df.columns:
-        df['return'].hist(bins=50, color=CHART_CONFIG['colors']['primary'], 
-                         alpha=0.7, edgecolor='black', ax=ax)
-        ax.set_xlabel('Daily Return', size=CHART_CONFIG['fontsize']['label'])
-        ax.set_ylabel('Frequency', size=CHART_CONFIG['fontsize']['label'])
-        ax.set_title('Distribution of Daily Returns', size=CHART_CONFIG['fontsize']['title'])
+        returns = df['return'].to_numpy(dtype=np.float64)
+        counts, edges = np.histogram(returns[~np.isnan(returns)], bins=50)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', 
+               color=colors['primary'], alpha=0.7, edgecolor='black')
+        ax.set_xlabel('Daily Return', size=fontsize['label'])
+        ax.set_ylabel('Frequency', size=fontsize['label'])
+        ax.set_title('Distribution of Daily Returns', size=fontsize['title'])
         ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    
-    # Save figure
-    if save_path is None:
-        save_path = os.path.join(IMAGES_DIR, 'returns_distribution.png')
-    
-    plt.savefig(save_path, dpi=100, bbox_inches='tight')
-    plt.close()
+    _save_png(fig, save_path, prune=content_addressed)
     
     return save_path
 
@@ -220,36 +489,39 @@ def plot_model_comparison(models_df, save_path=None):
         Path where the figure was saved
     """
     # Get top 10 models
-    top_models = models_df.head(10).copy()
-    top_models['RMSE'] = pd.to_numeric(top_models['RMSE'])
+    top_models = models_df.head(10)
+    
+    content_addressed = save_path is None
+    if content_addressed:
+        save_path = _content_path('model_comparison', _select(top_models, ['model type', 'order', 'RMSE']))
+        if _reuse(save_path):
+            return save_path
     
-    fig, ax = plt.subplots(figsize=(14, 8))
+    # float32 is plenty for bar lengths and 4-decimal labels; unparseable scores become NaN
+    rmse = pd.to_numeric(top_models['RMSE'], downcast='float', errors='coerce').to_numpy()
+    
+    colors = CHART_CONFIG['colors']
+    fontsize = CHART_CONFIG['fontsize']
+    fig, ax = _get_axes((14, 8))
     
     # Create labels
-    labels = [f"{row['model type']}\n{row['order']}" for _, row in top_models.iterrows()]
+    labels = (top_models['model type'].astype(str) + '\n' + top_models['order'].astype(str)).tolist()
     
     # Create bar chart
-    bars = ax.barh(range(len(top_models)), top_models['RMSE'], 
-                   color=CHART_CONFIG['colors']['primary'], alpha=0.7)
+    ax.barh(range(len(top_models)), rmse, 
+            color=colors['primary'], alpha=0.7)
     
     ax.set_yticks(range(len(top_models)))
     ax.set_yticklabels(labels)
-    ax.set_xlabel('RMSE', size=CHART_CONFIG['fontsize']['label'])
-    ax.set_title('Model Comparison (Top 10)', size=CHART_CONFIG['fontsize']['title'])
+    ax.set_xlabel('RMSE', size=fontsize['label'])
+    ax.set_title('Model Comparison (Top 10)', size=fontsize['title'])
     ax.grid(True, alpha=0.3, axis='x')
     
     # Add value labels on bars
-    for i, (bar, value) in enumerate(zip(bars, top_models['RMSE'])):
+    for i, value in enumerate(rmse):
         ax.text(value, i, f' {value:.4f}', va='center', fontsize=10)
     
-    plt.tight_layout()
-    
-    # Save figure
-    if save_path is None:
-        save_path = os.path.join(IMAGES_DIR, 'model_comparison.png')
-    
-    plt.savefig(save_path, dpi=100, bbox_inches='tight')
-    plt.close()
+    _save_png(fig, save_path, prune=content_addressed)
     
     return save_path
 
@@ -272,24 +544,43 @@ def create_all_visualizations(df, predictions_df=None, models_df=None):
     dict
         Dictionary with visualization names and file paths
     """
-    vis_paths = {}
-    
-    print("Creating historical price chart...")
-    vis_paths['historical'] = plot_historical_prices(df)
+    # Each chart only receives the columns it draws, which keeps the payload sent to workers small
+    price_columns = ['Close', 'sma_30', 'sma_200']
+    prediction_columns = ['Close', 'pred_today', 'pred_tomorrow', 'pred_2_days']
     
-    print("Creating returns distribution chart...")
-    vis_paths['returns'] = plot_returns_distribution(df)
+    tasks = {
+        'historical': ("Creating historical price chart...", plot_historical_prices, _select(df, price_columns)),
+        'returns': ("Creating returns distribution chart...", plot_returns_distribution, _select(df, ['return'])),
+    }
     
     if predictions_df is not None and 'pred_today' in predictions_df.columns:
-        print("Creating predictions chart...")
-        vis_paths['predictions'] = plot_predictions(predictions_df)
-        
-        print("Creating overlap chart...")
-        vis_paths['overlap'] = plot_predictions_overlap(predictions_df)
+        predictions_df = _select(predictions_df, prediction_columns)
+        tasks['predictions'] = ("Creating predictions chart...", plot_predictions, predictions_df)
+        tasks['overlap'] = ("Creating overlap chart...", plot_predictions_overlap, predictions_df)
     
     if models_df is not None:
-        print("Creating model comparison chart...")
-        vis_paths['models'] = plot_model_comparison(models_df)
+        tasks['models'] = ("Creating model comparison chart...", plot_model_comparison, models_df.head(10))
+    
+    workers = min(len(tasks), os.cpu_count() or 1)
+    if workers == 1:
+        vis_paths = {}
+        _FIGURE_CACHE.figures = {}
+        try:
+            for name, (message, plot, data) in tasks.items():
+                print(message)
+                vis_paths[name] = plot(data)
+        finally:
+            # The figures go with the batch rather than living on in this thread
+            _FIGURE_CACHE.figures = None
+        return vis_paths
+    
+    # The charts are independent and figures are not thread-safe, so render them in separate processes
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for name, (message, plot, data) in tasks.items():
+            print(message)
+            futures[name] = executor.submit(plot, data)
+        vis_paths = {name: future.result() for name, future in futures.items()}
     
     return vis_paths
 